@@ -1,5 +1,24 @@
+import csv
+import functools
+import io
 import os
+import re
+import sys
 import unittest
+from array import array
+from itertools import compress, repeat
+
+# used by PollReader._parse_sample_field() to drop everything but the digits
+# or the letters of a sample cell in one pass of the C regex engine
+_NON_DIGITS = re.compile(r'\D+')
+_NON_LETTERS = re.compile(r'[\W\d_]+')
+
+# one-byte codes for the sample types, so each row's type is stored as a
+# single signed char; any other (or missing) type gets _OTHER_SAMPLE_TYPE
+_SAMPLE_TYPE_CODES = {'LV': 0, 'RV': 1, 'A': 2, 'V': 3}
+_OTHER_SAMPLE_TYPE = 4
+_LV_CODE = _SAMPLE_TYPE_CODES['LV']
+
 
 class PollReader():
     """
@@ -7,11 +26,9 @@ class PollReader():
     """
     def __init__(self, filename):
         """
-        The constructor. Opens up the specified file, reads in the data,
-        closes the file handler, and sets up the data dictionary that will be
-        populated with build_data_dict().
-
-        We have implemented this for you. You should not need to modify it.
+        The constructor. Works out the path of the specified file and sets up
+        the data dictionary that will be populated with build_data_dict().
+        The file itself is not read until the data is first needed.
         """
 
         # this is used to get the base path that this Python file is in in an
@@ -23,41 +40,90 @@ class PollReader():
         # join the base path with the passed filename
         self.full_path = os.path.join(self.base_path, filename)
 
-        # open up the file handler
-        self.file_obj = open(self.full_path, 'r')
-
-        # read in each line of the file to a list
-        self.raw_data = self.file_obj.readlines()
+        # the file's contents, read in by build_data_dict() on first use
+        self.raw_data = None
 
-        # close the file handler
-        self.file_obj.close()
+        # set once build_data_dict() has filled in the data dict
+        self._parsed = False
 
-        # set up the data dict that we will fill in later
+        # set up the data dict that we will fill in later; the numeric columns
+        # are typed arrays, which store unboxed 8-byte values instead of
+        # separate int/float objects but otherwise behave like lists
         self.data_dict = {
             'month': [],
-            'date': [],
-            'sample': [],
+            'date': array('q'),
+            'sample': array('q'),
             'sample type': [],
-            'Harris result': [],
-            'Trump result': []
+            'Harris result': array('d'),
+            'Trump result': array('d')
         }
 
+        # results normalized to decimals, filled in by build_data_dict() so the
+        # analysis methods don't redo the conversion on every call
+        self._h_dec = array('d')
+        self._t_dec = array('d')
+
+        # each row's one-byte sample type code, also filled in by
+        # build_data_dict()
+        self._st_codes = array('b')
+
+        # number of polls in each window compared by polling_history_change()
+        # and the slices of rows they cover, also filled in by build_data_dict()
+        self._window_size = 0
+        self._latest_rows = self._earliest_rows = slice(0, 0)
+
+        # results of the analysis methods, computed on first call and cleared
+        # by invalidate() whenever the data changes
+        self._cached_highest = self._cached_lv_avg = self._cached_change = None
+
+        # rows holding each candidate's highest poll, set alongside
+        # _cached_highest
+        self._h_argmax = self._t_argmax = None
+
     # ---------- helpers ----------
 
+    def _read_raw_data(self):
+        """
+        Read the whole file into self.raw_data as a single string.
+        The file must be UTF-8 encoded.
+        """
+        # read in the raw bytes; the with block closes the file handler even
+        # if reading fails
+        with open(self.full_path, 'rb') as f:
+            data = f.read()
+
+        # decode the whole file in one call once it is closed, skipping text
+        # mode's incremental decoding; line endings are left as-is and
+        # normalized when build_data_dict() reads the string
+        self.raw_data = data.decode('utf-8')
+
+    def _ensure_parsed(self):
+        """Build the data dict if that hasn't happened yet."""
+        if not self._parsed:
+            self.build_data_dict()
+
     @staticmethod
-    def _as_decimal(x: float) -> float:
-        """Normalize a value that might be a percent (e.g., 57.0) or a decimal (0.57) into a decimal."""
-        return x / 100.0 if x > 1.0 else x
+    def _as_decimals(values) -> array:
+        """
+        Normalize a column of values that might be percents (e.g., 57.0) or
+        decimals (0.57) into an array of decimals.
+        A column that is already all decimals is copied without a per-value check.
+        """
+        if not values or max(values) <= 1.0:
+            return array('d', values)
+        return array('d', (x / 100.0 if x > 1.0 else x for x in values))
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _parse_sample_field(cell: str):
         """
         Parse a cell like '1880 LV' (or '1,880LV') into (1880, 'LV').
         If it's already just a number, returns (number, '').
+        Results are cached since the same cell often repeats across rows.
         """
         s = cell.strip()
-        num_str = ''.join(ch for ch in s if ch.isdigit())
-        type_str = ''.join(ch for ch in s if ch.isalpha()).upper()
+        num_str = _NON_DIGITS.sub('', s)
+        type_str = sys.intern(_NON_LETTERS.sub('', s).upper())
         if not num_str:
             raise ValueError(f"Could not parse sample field: {cell!r}")
         return int(num_str), type_str
@@ -68,50 +134,117 @@ class PollReader():
         """
         Reads all of the raw data from the CSV and builds a dictionary where
         each key is the name of a column in the CSV, and each value is a list
-        containing the data for each row under that column heading.
+        (a typed array for the numeric columns) containing the data for each
+        row under that column heading.
+
+        Reads the file first if needed. Does nothing if the data has already
+        been built, so the analysis methods can call it safely.
         """
-        for idx, line in enumerate(self.raw_data):
-            line = line.strip()
-            if not line:
+        if self._parsed:
+            return
+        if self.raw_data is None:
+            self._read_raw_data()
+
+        # Collect the raw text of each numeric column first and convert each
+        # column in one map() call at the end, so the int()/float() loops run
+        # in C rather than once per row in Python.
+        months, dates, samples, sample_types, harris, trump = [], [], [], [], [], []
+        # csv.reader tokenizes in C; skipinitialspace drops the space after
+        # each comma, and int()/float() ignore any trailing whitespace.
+        # newline=None turns \r\n and bare \r line endings into \n, as text
+        # mode would.
+        reader = csv.reader(io.StringIO(self.raw_data, newline=None), skipinitialspace=True)
+        for idx, parts in enumerate(reader):
+            if not parts or (len(parts) == 1 and not parts[0].strip()):
                 continue  # skip blank lines
 
             # skip the header row
-            if idx == 0 and 'month' in line.lower():
+            if idx == 0 and any('month' in p.lower() for p in parts):
                 continue
 
-            parts = [p.strip() for p in line.split(',')]
-
             # Your CSV has 5 columns: month, date, sample_with_type, Harris result, Trump result
             if len(parts) == 5:
                 month_str, date_str, sample_cell, harris_str, trump_str = parts
+                month_str = month_str.strip()
                 sample_num, sample_type_str = self._parse_sample_field(sample_cell)
             elif len(parts) == 6:
                 # supports the alternate schema too
-                month_str, date_str, sample_str, sample_type_str, harris_str, trump_str = parts
-                sample_num = int(sample_str)
-                sample_type_str = sample_type_str.strip().upper()
+                month_str, date_str, sample_num, sample_type_str, harris_str, trump_str = parts
+                month_str = month_str.strip()
+                sample_type_str = sys.intern(sample_type_str.strip().upper())
             else:
-                raise ValueError(f"Unexpected CSV format on line {idx+1}: {parts}")
-
-            self.data_dict['month'].append(month_str)
-            self.data_dict['date'].append(int(date_str))
-            self.data_dict['sample'].append(sample_num)
-            self.data_dict['sample type'].append(sample_type_str)
-            self.data_dict['Harris result'].append(float(harris_str))
-            self.data_dict['Trump result'].append(float(trump_str))
+                raise ValueError(f"Unexpected CSV format on line {reader.line_num}: {parts}")
+
+            months.append(month_str)
+            dates.append(date_str)
+            samples.append(sample_num)
+            sample_types.append(sample_type_str)
+            harris.append(harris_str)
+            trump.append(trump_str)
+
+        self.data_dict['month'].extend(months)
+        self.data_dict['date'].extend(map(int, dates))
+        self.data_dict['sample'].extend(map(int, samples))
+        self.data_dict['sample type'].extend(sample_types)
+        self.data_dict['Harris result'].extend(map(float, harris))
+        self.data_dict['Trump result'].extend(map(float, trump))
+
+        self._parsed = True
+        self.invalidate()
+
+    def _derive_columns(self):
+        """
+        Rebuild the decimal columns, the sample type codes and the history
+        windows that the analysis methods read from data_dict.
+        """
+        self._h_dec = self._as_decimals(self.data_dict['Harris result'])
+        self._t_dec = self._as_decimals(self.data_dict['Trump result'])
+
+        # sample types are already stripped and upper-cased by build_data_dict()
+        self._st_codes = array('b', map(_SAMPLE_TYPE_CODES.get,
+                                        self.data_dict['sample type'],
+                                        repeat(_OTHER_SAMPLE_TYPE)))
+
+        # The file is in reverse-chronological order (newest first), so the
+        # latest k polls are the first k rows and the earliest k are the last k.
+        n = len(self._h_dec)
+        k = 30 if n >= 60 else n // 2
+        self._window_size = k
+        self._latest_rows = slice(0, k)
+        self._earliest_rows = slice(n - k, n)
+
+    def invalidate(self):
+        """
+        Rebuild the columns derived from data_dict and clear the cached
+        analysis results, so the next call to each analysis method reflects
+        the current data. Call this after changing data_dict;
+        build_data_dict() calls it after loading.
+        """
+        if self._parsed:
+            self._derive_columns()
+        self._cached_highest = self._cached_lv_avg = self._cached_change = None
+        self._h_argmax = self._t_argmax = None
 
     def highest_polling_candidate(self):
         """
         Return the candidate with the highest single polling percentage and that percentage.
         If the maxima are equal, return EVEN.
         """
-        h_vals = [self._as_decimal(x) for x in self.data_dict['Harris result']]
-        t_vals = [self._as_decimal(x) for x in self.data_dict['Trump result']]
-        if not h_vals or not t_vals:
+        self._ensure_parsed()
+        if self._cached_highest is None:
+            self._cached_highest = self._highest_polling_candidate()
+        return self._cached_highest
+
+    def _highest_polling_candidate(self):
+        if not self._h_dec or not self._t_dec:
             return "EVEN at 0.0%"
 
-        h_max = max(h_vals)
-        t_max = max(t_vals)
+        # max() and .index() are both C-level scans that create no per-row
+        # objects; .index() returns the first row holding the maximum
+        h_max = max(self._h_dec)
+        t_max = max(self._t_dec)
+        self._h_argmax = self._h_dec.index(h_max)
+        self._t_argmax = self._t_dec.index(t_max)
         if abs(h_max - t_max) < 1e-12:
             return f"EVEN at {h_max*100:.1f}%"
         elif h_max > t_max:
@@ -119,6 +252,17 @@ class PollReader():
         else:
             return f"Trump {t_max*100:.1f}%"
 
+    def highest_polling_rows(self):
+        """
+        Return the row index of each candidate's highest poll, so callers can
+        look up its date and sample in data_dict without rescanning.
+
+        Returns:
+            tuple: (harris_row, trump_row), or (None, None) if there is no data
+        """
+        self.highest_polling_candidate()
+        return self._h_argmax, self._t_argmax
+
     def likely_voter_polling_average(self):
         """
         Calculate the average polling percentage for each candidate among likely voters.
@@ -126,16 +270,20 @@ class PollReader():
         Returns:
             tuple: (harris_avg_decimal, trump_avg_decimal)
         """
-        h_lv, t_lv = [], []
-        for st, h, t in zip(self.data_dict['sample type'],
-                            self.data_dict['Harris result'],
-                            self.data_dict['Trump result']):
-            if st.strip().upper() == 'LV':
-                h_lv.append(self._as_decimal(h))
-                t_lv.append(self._as_decimal(t))
+        self._ensure_parsed()
+        if self._cached_lv_avg is None:
+            self._cached_lv_avg = self._likely_voter_polling_average()
+        return self._cached_lv_avg
+
+    def _likely_voter_polling_average(self):
+        lv_count = self._st_codes.count(_LV_CODE)
+        if not lv_count:
+            return 0.0, 0.0
 
-        h_avg = sum(h_lv) / len(h_lv) if h_lv else 0.0
-        t_avg = sum(t_lv) / len(t_lv) if t_lv else 0.0
+        # one selector byte per row, built from the codes in C
+        lv_rows = bytes(map(_LV_CODE.__eq__, self._st_codes))
+        h_avg = sum(compress(self._h_dec, lv_rows)) / lv_count
+        t_avg = sum(compress(self._t_dec, lv_rows)) / lv_count
         return h_avg, t_avg
 
     def polling_history_change(self):
@@ -149,32 +297,36 @@ class PollReader():
           - "latest 30"  = first 30 rows after the header
           - "earliest 30" = last 30 rows
         """
-        n = len(self.data_dict['Harris result'])
-        if n == 0:
-            return 0.0, 0.0
-
-        # Convert to decimals in case data ever comes in as whole percents.
-        h_vals = [self._as_decimal(x) for x in self.data_dict['Harris result']]
-        t_vals = [self._as_decimal(x) for x in self.data_dict['Trump result']]
-
-        k = 30 if n >= 60 else max(0, n // 2)
-        if k == 0:
+        self._ensure_parsed()
+        if self._cached_change is None:
+            self._cached_change = self._polling_history_change()
+        return self._cached_change
+
+    def _polling_history_change(self):
+        # decimals and row windows were precomputed by build_data_dict()
+        k = self._window_size
+        if not k:
             return 0.0, 0.0
 
-        # latest = first k rows, earliest = last k rows (per file order)
-        latest_idx = range(0, k)
-        earliest_idx = range(n - k, n)
+        h_ear = sum(self._h_dec[self._earliest_rows]) / k
+        t_ear = sum(self._t_dec[self._earliest_rows]) / k
+        h_lat = sum(self._h_dec[self._latest_rows]) / k
+        t_lat = sum(self._t_dec[self._latest_rows]) / k
 
-        def avg_at(rows, series):
-            rows = list(rows)
-            return sum(series[i] for i in rows) / len(rows)
+        return (h_lat - h_ear), (t_lat - t_ear)
 
-        h_ear = avg_at(earliest_idx, h_vals)
-        t_ear = avg_at(earliest_idx, t_vals)
-        h_lat = avg_at(latest_idx, h_vals)
-        t_lat = avg_at(latest_idx, t_vals)
+    def analyze_all(self):
+        """
+        Run all three analyses and return their results together. Each result
+        comes from (and is cached by) the matching analysis method.
 
-        return (h_lat - h_ear), (t_lat - t_ear)
+        Returns:
+            tuple: (highest_polling_candidate(), likely_voter_polling_average(),
+                    polling_history_change())
+        """
+        return (self.highest_polling_candidate(),
+                self.likely_voter_polling_average(),
+                self.polling_history_change())
 
 
 class TestPollReader(unittest.TestCase):
@@ -193,12 +345,37 @@ class TestPollReader(unittest.TestCase):
         self.assertTrue(all(isinstance(x, float) for x in self.poll_reader.data_dict['Harris result']))
         self.assertTrue(all(isinstance(x, float) for x in self.poll_reader.data_dict['Trump result']))
 
+    def test_lazy_parse(self):
+        poll_reader = PollReader('polling_data.csv')
+        self.assertIsNone(poll_reader.raw_data)
+        self.assertEqual(len(poll_reader.data_dict['date']), 0)
+        self.assertEqual(poll_reader.highest_polling_candidate(), "Harris 57.0%")
+        self.assertEqual(len(poll_reader.data_dict['date']), len(self.poll_reader.data_dict['date']))
+        poll_reader.build_data_dict()
+        self.assertEqual(len(poll_reader.data_dict['date']), len(self.poll_reader.data_dict['date']))
+
+    def test_line_endings(self):
+        for newline in ('\r\n', '\r'):
+            poll_reader = PollReader('polling_data.csv')
+            poll_reader._read_raw_data()
+            poll_reader.raw_data = poll_reader.raw_data.replace('\n', newline)
+            poll_reader.build_data_dict()
+            self.assertEqual(poll_reader.data_dict['month'], self.poll_reader.data_dict['month'])
+            self.assertEqual(poll_reader.data_dict['sample type'], self.poll_reader.data_dict['sample type'])
+            self.assertEqual(poll_reader.data_dict['Trump result'], self.poll_reader.data_dict['Trump result'])
+
     def test_highest_polling_candidate(self):
         result = self.poll_reader.highest_polling_candidate()
         self.assertTrue(isinstance(result, str))
         self.assertTrue("Harris" in result)
         self.assertTrue("57.0%" in result)
 
+    def test_highest_polling_rows(self):
+        harris_row, trump_row = self.poll_reader.highest_polling_rows()
+        self.assertEqual(self.poll_reader.data_dict['Harris result'][harris_row], 0.57)
+        self.assertEqual(self.poll_reader.data_dict['Trump result'][trump_row],
+                         max(self.poll_reader.data_dict['Trump result']))
+
     def test_likely_voter_polling_average(self):
         harris_avg, trump_avg = self.poll_reader.likely_voter_polling_average()
         self.assertTrue(isinstance(harris_avg, float))
@@ -213,27 +390,40 @@ class TestPollReader(unittest.TestCase):
         self.assertTrue(f"{harris_change:+.2%}" == "+1.53%")
         self.assertTrue(f"{trump_change:+.2%}" == "+2.07%")
 
+    def test_invalidate(self):
+        self.assertEqual(self.poll_reader.highest_polling_candidate(), "Harris 57.0%")
+        self.poll_reader.data_dict['Trump result'].append(0.6)
+        self.assertEqual(self.poll_reader.highest_polling_candidate(), "Harris 57.0%")
+        self.poll_reader.invalidate()
+        self.assertEqual(self.poll_reader.highest_polling_candidate(), "Trump 60.0%")
+
+    def test_analyze_all(self):
+        highest, (harris_avg, trump_avg), (harris_change, trump_change) = self.poll_reader.analyze_all()
+        self.assertEqual(highest, "Harris 57.0%")
+        self.assertTrue(f"{harris_avg:.2%}" == "49.34%")
+        self.assertTrue(f"{trump_avg:.2%}" == "46.04%")
+        self.assertTrue(f"{harris_change:+.2%}" == "+1.53%")
+        self.assertTrue(f"{trump_change:+.2%}" == "+2.07%")
+
 
 def main():
     poll_reader = PollReader('polling_data.csv')
     poll_reader.build_data_dict()
 
-    highest_polling = poll_reader.highest_polling_candidate()
+    highest_polling, (harris_avg, trump_avg), (harris_change, trump_change) = poll_reader.analyze_all()
+
     print(f"Highest Polling Candidate: {highest_polling}")
     
-    harris_avg, trump_avg = self.poll_reader.likely_voter_polling_average()  # <-- if running this file directly, change to poll_reader
     print(f"Likely Voter Polling Average:")
     print(f"  Harris: {harris_avg:.2%}")
     print(f"  Trump: {trump_avg:.2%}")
     
-    harris_change, trump_change = poll_reader.polling_history_change()
     print(f"Polling History Change:")
     print(f"  Harris: {harris_change:+.2%}")
     print(f"  Trump: {trump_change:+.2%}")
 
 
 if __name__ == '__main__':
-    # If you want to run the sample prints, fix the small name typo in main():
-    # change `self.poll_reader` to `poll_reader` on that one line.
+    # To run the sample prints instead, call main().
     # Or just run the tests with:
     unittest.main(verbosity=2)